@@ -44,7 +44,6 @@ def main():
         raise SystemExit(f"DB file not found: {db_path}")
 
     conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
     print(f"Inspecting: {db_path}\n")
@@ -114,42 +113,44 @@ def main():
     # --- Sample rows ---
     if total > 0:
         print(f"\nSample of first {min(args.limit, total)} messages:\n")
+        # Explicit column list (NULL for any column an older DB lacks) so
+        # rows can be unpacked as plain tuples.
+        sample_cols = [
+            "id", "echo", "date_iso", "size_bytes", "msg_lines",
+            "pct_quoted", "from_name", "subject", "imported_at",
+        ]
+        select_list = ", ".join(c if c in colset else "NULL" for c in sample_cols)
         cur.execute(
-            """SELECT * FROM pkt_messages
+            f"""SELECT {select_list} FROM pkt_messages
                    ORDER BY rowid ASC
                    LIMIT ?""",
             (args.limit,),
         )
 
         # We'll base printing on available columns
+        show_id = "id" in colset
         show_msg_lines = has_msg_lines
         show_pct_quoted = has_pct_quoted
 
-        for row in cur.fetchall():
-            keys = row.keys()
-
-            echo = shorten((row["echo"] or "UNKNOWN"), 30) if "echo" in keys else "UNKNOWN"
-            date_iso = row["date_iso"] if "date_iso" in keys else None
-            size_bytes = row["size_bytes"] if "size_bytes" in keys else None
-            from_name = shorten((row["from_name"] or "") if "from_name" in keys else "", 25)
-            subject = shorten((row["subject"] or "") if "subject" in keys else "", 40)
-            imported = row["imported_at"] if "imported_at" in keys else None
+        for (id_, echo, date_iso, size_bytes, ml, pq,
+             from_name, subject, imported) in cur:
+            echo = shorten((echo or "UNKNOWN"), 30)
+            from_name = shorten(from_name or "", 25)
+            subject = shorten(subject or "", 40)
 
             parts = [
-                f"[{row['id']}]" if "id" in keys else "[?]",
+                f"[{id_}]" if show_id else "[?]",
                 f"Area={echo:<30}",
                 f"date_iso={date_iso or '-'}",
                 f"size={size_bytes if size_bytes is not None else '-'}",
             ]
 
             if show_msg_lines:
-                ml = row["msg_lines"]
                 parts.append(f"lines={ml if ml is not None else '-'}")
 
             if show_pct_quoted:
-                val = row["pct_quoted"]
-                parts.append(f"quoted={val:.1f}%"
-                             if isinstance(val, (int, float)) else "quoted=-")
+                parts.append(f"quoted={pq:.1f}%"
+                             if isinstance(pq, (int, float)) else "quoted=-")
 
             parts.append(f"from={from_name!r}")
             parts.append(f"subj={subject!r}")
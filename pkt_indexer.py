@@ -23,26 +23,84 @@
 # -----------------------------------------------------------------------------
 
 import argparse
+import functools
+import mmap
+import os
+import re
 import sqlite3
 import struct
-import re
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Iterator, Optional, Tuple, List
 
 
 # ============================================================
 # Date Parsing Helpers
 # ============================================================
 
-def parse_fido_datetime(s: str) -> Tuple[Optional[str], str]:
+_MON = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+
+def _is_num(s: str, min_len: int, max_len: int) -> bool:
+    return min_len <= len(s) <= max_len and s.isascii() and s.isdigit()
+
+
+def _fast_fido_datetime(raw: str) -> Optional[datetime]:
+    """
+    Hand parser for the usual 'DD Mon YY  HH:MM:SS' (or YYYY) layout.
+    Returns None for anything it isn't sure about so the caller can fall
+    back to strptime.
+    """
+    parts = raw.split()
+    if len(parts) != 4:
+        return None
+    day, mon, year, hms = parts
+
+    month = _MON.get(mon.title())
+    if month is None or not _is_num(day, 1, 2):
+        return None
+
+    if _is_num(year, 2, 2):
+        # Same pivot as strptime's %y: 69-99 -> 19xx, 00-68 -> 20xx
+        y = int(year)
+        y += 1900 if y >= 69 else 2000
+    elif _is_num(year, 4, 4):
+        y = int(year)
+    else:
+        return None
+
+    hms = hms.split(":")
+    if len(hms) != 3 or not all(_is_num(x, 1, 2) for x in hms):
+        return None
+
+    # datetime() range-checks day/hour/minute/second for us
+    return datetime(y, month, int(day), int(hms[0]), int(hms[1]), int(hms[2]))
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_fido_datetime(s: str) -> Optional[str]:
     """
     Try to parse a Fido/PKT style date string into ISO format.
-    Returns (iso_datetime, raw_string).
+    Returns the ISO datetime string, or None if unparseable.
+
+    Memoised: messages in a packet often share the exact same timestamp.
     """
     raw = s.strip()
     if not raw:
-        return None, s
+        return None
+
+    try:
+        dt = _fast_fido_datetime(raw)
+    except ValueError:
+        dt = None
+    if dt is not None:
+        return dt.isoformat(sep=" ")
 
     fmts = [
         "%d %b %y  %H:%M:%S",
@@ -54,46 +112,62 @@ def parse_fido_datetime(s: str) -> Tuple[Optional[str], str]:
     for fmt in fmts:
         try:
             dt = datetime.strptime(raw, fmt)
-            return dt.isoformat(sep=" "), s
+            return dt.isoformat(sep=" ")
         except ValueError:
             pass
 
-    return None, s
+    return None
 
 
 def parse_pkt_datetime(date_str: str) -> Optional[str]:
     """Compatibility wrapper if you ever want a simple call."""
-    iso, _ = parse_fido_datetime(date_str)
-    return iso
+    return parse_fido_datetime(date_str)
 
 
 # ============================================================
 # Echo & Body Analysis
 # ============================================================
 
-def extract_echo(body_text: str) -> Optional[str]:
+# One body line per match, same breaks as bytes.splitlines() (CR, LF, CRLF).
+# Lets find_echo() stop after the first few lines without splitting the
+# whole body.
+_LINE_RE = re.compile(rb"([^\r\n]*)(?:\r\n|\r|\n)?")
+
+
+def area_from_line(line: bytes) -> Optional[str]:
+    """Return the area name if line is an AREA: line (optionally ^A-prefixed)."""
+    if line.startswith(b"\x01"):
+        line = line[1:]  # drop kludge prefix
+    if line[:5].upper() == b"AREA:":
+        area = line[5:].decode("latin-1").strip()
+        if area:
+            return area
+    return None
+
+
+def find_echo(body_bytes: bytes) -> Optional[str]:
     """
-    Echomail area is usually on a line like:
-      AREA:CONNEMARA.WEATHER
-    Sometimes preceded by a ^A (0x01). We scan the first ~30 lines.
+    Echo lookup only (first ~30 lines, like scan_body), for when body
+    statistics aren't wanted (--no-body-stats).
     """
-    for line in body_text.splitlines()[:30]:
-        if not line:
-            continue
-        if line.startswith("\x01"):
-            line = line[1:]  # drop kludge prefix
-
-        if line.upper().startswith("AREA:"):
-            area = line[5:].strip()
-            if area:
-                return area
+    for i, m in enumerate(_LINE_RE.finditer(body_bytes)):
+        if i >= 30 or m.start() == m.end():  # empty match == end of body
+            break
+        area = area_from_line(m.group(1))
+        if area:
+            return area
     return None
 
 
-def analyse_body(body_text: str):
+def scan_body(body_bytes: bytes) -> Tuple[Optional[str], int, Optional[float]]:
     """
-    Analyse the message body text and return:
-      (msg_lines, pct_quoted)
+    Single pass over the raw message body bytes. Returns:
+      (echo, msg_lines, pct_quoted)
+
+    echo:
+        Echomail area, usually on a line like:
+          AREA:CONNEMARA.WEATHER
+        Sometimes preceded by a ^A (0x01). We scan the first ~30 lines.
 
     msg_lines:
         number of non-kludge lines (lines NOT starting with ^A)
@@ -102,57 +176,115 @@ def analyse_body(body_text: str):
         percentage of those non-kludge lines that are quoted,
         i.e. begin with '>' (ignoring leading whitespace).
         Returns None if there are no non-kludge lines.
+
+    Works on bytes (split on CR/LF only) so no decode or regex is needed;
+    startswith/lstrip are single C-level passes per line.
     """
-    lines = body_text.splitlines()
-    usable = [l for l in lines if not l.startswith("\x01")]  # remove kludges
+    echo = None
+    total = 0
+    quoted = 0
+
+    for i, line in enumerate(body_bytes.splitlines()):
+        is_kludge = line.startswith(b"\x01")
+
+        if echo is None and i < 30:
+            echo = area_from_line(line)
+
+        if is_kludge:
+            continue
+        total += 1
+        if line.lstrip().startswith(b">"):
+            quoted += 1
 
-    total = len(usable)
     if total == 0:
-        return 0, None
+        return echo, 0, None
 
-    quoted = sum(1 for l in usable if re.match(r"\s*>", l))
     pct = (quoted * 100.0) / float(total)
-    return total, pct
+    return echo, total, pct
 
 
 # ============================================================
 # PKT Parsing Helpers
 # ============================================================
 
-def read_cstr(data: bytes, offset: int) -> Tuple[str, int]:
+def read_cstr_bytes(data: bytes, offset: int) -> Tuple[bytes, int]:
     """
-    Read a NUL-terminated string starting at offset.
-    Returns (decoded_string, new_offset_past_nul).
+    Read a NUL-terminated string starting at offset, without decoding.
+    Returns (raw_bytes, new_offset_past_nul).
     """
     end = data.find(b"\x00", offset)
     if end == -1:
         raise ValueError("Missing NUL terminator in PKT string")
-    s = data[offset:end]
-    return s.decode("latin-1", errors="replace"), end + 1
+    return data[offset:end], end + 1
+
+
+def read_cstr(data: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Read a NUL-terminated string starting at offset.
+    Returns (decoded_string, new_offset_past_nul).
+    """
+    s, offset = read_cstr_bytes(data, offset)
+    return s.decode("latin-1", errors="replace"), offset
 
 
 PKT_HDR_LEN = 58  # Type 2/2+ header length
 
+# Precompiled message header layouts (saves a format lookup per message)
+_U16 = struct.Struct("<H")
+_HDR10 = struct.Struct("<HHHHHHHHHH")
+
+
+# One parsed message, in the same column order as INSERT_SQL (minus the
+# trailing imported_at, which is added at insert time)
+Message = Tuple[str, int, Optional[str], str, Optional[str],
+                int, Optional[int], Optional[float], str, str]
 
-def parse_pkt_file(pkt_path: Path) -> List[dict]:
+
+def iter_pkt_messages(pkt_path: Path, want_stats: bool = True) -> Iterator[Message]:
     """
-    Parse a .pkt and return a list of message dicts with keys:
+    Parse a .pkt and yield one tuple per message (INSERT_SQL column order):
       pkt_file, msg_index, date_iso, date_raw, echo,
       size_bytes, msg_lines, pct_quoted, from_name, subject
+
+    The file is mmap'd read-only rather than read into one big bytes
+    object; only the individual fields we keep are copied out.
+
+    With want_stats=False only the AREA line is looked for and msg_lines /
+    pct_quoted are None.
     """
-    data = pkt_path.read_bytes()
-    if len(data) < PKT_HDR_LEN:
-        raise ValueError(f"{pkt_path} too small to be a PKT")
+    with open(pkt_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < PKT_HDR_LEN:
+            # (also covers empty files, which mmap refuses)
+            raise ValueError(f"{pkt_path} too small to be a PKT")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_pkt_data(pkt_path, data, want_stats)
+
 
+def parse_pkt_file(pkt_path: Path, want_stats: bool = True) -> List[Message]:
+    """Parse a whole .pkt into a list of message tuples (see iter_pkt_messages)."""
+    return list(iter_pkt_messages(pkt_path, want_stats))
+
+
+def iter_pkt_data(pkt_path: Path, data, want_stats: bool = True) -> Iterator[Message]:
+    """
+    Walk the messages in a PKT buffer (bytes or mmap). See iter_pkt_messages().
+    """
+    data_len = len(data)
+
+    # find() is a C memchr, and each call starts where the previous
+    # field ended, so the NUL lookups below add up to one forward sweep of
+    # the packet. Bind it locally to skip the attribute lookup per message.
+    find = data.find
+
+    pkt_file = str(pkt_path)
     off = PKT_HDR_LEN
-    results: List[dict] = []
     msg_index = 0
 
     while True:
-        if off + 2 > len(data):
+        if off + 2 > data_len:
             break
 
-        (msg_type,) = struct.unpack_from("<H", data, off)
+        (msg_type,) = _U16.unpack_from(data, off)
         off += 2
 
         # End-of-packet marker
@@ -161,60 +293,73 @@ def parse_pkt_file(pkt_path: Path) -> List[dict]:
 
         # Expect Type 2 message header (most common)
         # Header is 22 bytes total including msg_type already consumed (2 + 20).
-        if off + 20 > len(data):
+        if off + 20 > data_len:
             raise ValueError(f"{pkt_path}: truncated message header")
 
         # Remaining header fields (10 uint16s)
         # (origNode,destNode,origNet,destNet,origZone,destZone,
         #  origPoint,destPoint,attr,cost)
-        _fields = struct.unpack_from("<HHHHHHHHHH", data, off)
+        _fields = _HDR10.unpack_from(data, off)
         off += 20
 
-        date_str, off = read_cstr(data, off)
-        _to_name, off = read_cstr(data, off)
-        from_name, off = read_cstr(data, off)
-        subject, off = read_cstr(data, off)
+        # Keep header strings as bytes; only fields we store get decoded
+        date_b, off = read_cstr_bytes(data, off)
+        _to_name, off = read_cstr_bytes(data, off)
+        from_b, off = read_cstr_bytes(data, off)
+        subject_b, off = read_cstr_bytes(data, off)
 
         # Body is NUL-terminated
-        end = data.find(b"\x00", off)
+        end = find(b"\x00", off)
         if end == -1:
             raise ValueError(f"{pkt_path}: message body missing terminator")
 
         body_bytes = data[off:end]
         off = end + 1
 
-        body_text = body_bytes.decode("latin-1", errors="replace")
-
-        # Analyse body text for statistics
-        msg_lines, pct_quoted = analyse_body(body_text)
+        if want_stats:
+            # One pass over the raw body for echo + statistics
+            echo, msg_lines, pct_quoted = scan_body(body_bytes)
+        else:
+            echo = find_echo(body_bytes)
+            msg_lines = pct_quoted = None
 
-        date_iso, date_raw = parse_fido_datetime(date_str)
-        echo = extract_echo(body_text)
+        date_str = date_b.decode("latin-1", errors="replace")
+        date_iso = parse_fido_datetime(date_str)
         size_bytes = len(body_bytes)
 
-        results.append({
-            "pkt_file": str(pkt_path),
-            "msg_index": msg_index,
-            "date_iso": date_iso,
-            "date_raw": date_raw.strip(),
-            "echo": echo,
-            "size_bytes": size_bytes,
-            "msg_lines": msg_lines,
-            "pct_quoted": pct_quoted,
-            "from_name": from_name.strip(),
-            "subject": subject.strip(),
-        })
+        yield (
+            pkt_file,
+            msg_index,
+            date_iso,
+            date_str.strip(),
+            echo,
+            size_bytes,
+            msg_lines,
+            pct_quoted,
+            from_b.decode("latin-1", errors="replace").strip(),
+            subject_b.decode("latin-1", errors="replace").strip(),
+        )
 
         msg_index += 1
 
-    return results
+
+def parse_pkt_job(pkt_path: Path, want_stats: bool = True) -> Tuple[Optional[List[Message]], Optional[str]]:
+    """
+    Worker wrapper around parse_pkt_file for the process pool.
+    Returns (messages, None) on success or (None, error_text) on failure,
+    so one bad packet doesn't abort the whole map().
+    """
+    try:
+        return parse_pkt_file(pkt_path, want_stats), None
+    except Exception as e:
+        return None, str(e)
 
 
 # ============================================================
 # DB Schema & Helpers (schema_version = 2)
 # ============================================================
 
-SCHEMA_SQL = """
+SCHEMA_SQL_TABLE = """
 CREATE TABLE IF NOT EXISTS pkt_messages (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     pkt_file TEXT NOT NULL,
@@ -237,9 +382,6 @@ CREATE TABLE IF NOT EXISTS pkt_messages (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_pkt_unique
 ON pkt_messages(pkt_file, msg_index);
 
-CREATE INDEX IF NOT EXISTS idx_pkt_date ON pkt_messages(date_iso);
-CREATE INDEX IF NOT EXISTS idx_pkt_echo ON pkt_messages(echo);
-
 CREATE TABLE IF NOT EXISTS meta (
     key   TEXT PRIMARY KEY,
     value TEXT
@@ -249,14 +391,38 @@ INSERT OR IGNORE INTO meta (key, value)
 VALUES ('schema_version', '2');
 """
 
+# Secondary (report) indexes are built once after the bulk insert so each
+# row doesn't pay for extra B-tree updates. idx_pkt_unique stays in the
+# table script since INSERT OR IGNORE relies on it for dedup.
+SCHEMA_SQL_SECONDARY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_pkt_date ON pkt_messages(date_iso);
+CREATE INDEX IF NOT EXISTS idx_pkt_echo ON pkt_messages(echo);
+"""
+
+
+PRAGMA_SQL = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+"""
+
 
 def init_db(db_path: Path) -> sqlite3.Connection:
     """
     Initialise DB and auto-migrate older versions to include msg_lines/pct_quoted.
     Also bumps meta.schema_version to '2'.
+
+    Switches the DB to WAL journalling with synchronous=NORMAL for fast bulk
+    imports. Note journal_mode=WAL is stored in the DB file and persists
+    across runs (you will see -wal/-shm files next to it).
     """
-    conn = sqlite3.connect(str(db_path))
-    conn.executescript(SCHEMA_SQL)
+    # isolation_level=None: no implicit BEGINs, main() manages the
+    # transaction explicitly.
+    conn = sqlite3.connect(str(db_path), isolation_level=None, cached_statements=256)
+    conn.executescript(PRAGMA_SQL)
+    conn.executescript(SCHEMA_SQL_TABLE)
 
     # Ensure new columns exist for older databases
     cur = conn.cursor()
@@ -281,42 +447,90 @@ def init_db(db_path: Path) -> sqlite3.Connection:
     return conn
 
 
-def insert_messages(conn: sqlite3.Connection, messages: List[dict]) -> int:
+# Constant SQL strings so sqlite3's statement cache reuses the prepared
+# statements across files.
+_INSERT_HEAD = """
+INSERT OR IGNORE INTO pkt_messages
+  (pkt_file, msg_index, date_iso, date_raw, echo,
+   size_bytes, msg_lines, pct_quoted, from_name, subject,
+   imported_at)
+VALUES
+"""
+_INSERT_ROW = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+INSERT_SQL = _INSERT_HEAD + "  " + _INSERT_ROW
+
+# Multi-row VALUES variant: INSERT_CHUNK rows per statement. 64 rows x 11
+# columns stays under SQLITE_MAX_VARIABLE_NUMBER (999) on older SQLite.
+INSERT_CHUNK = 64
+INSERT_SQL_CHUNK = _INSERT_HEAD + "  " + ",\n  ".join([_INSERT_ROW] * INSERT_CHUNK)
+
+
+def insert_messages_batch(conn: sqlite3.Connection, messages: List[Message],
+                          imported_at: str) -> int:
+    """
+    Insert one file's message tuples. Does NOT commit; the caller owns the
+    transaction (see main()).
+
+    imported_at is bound explicitly (one timestamp per run, same UTC
+    'YYYY-MM-DD HH:MM:SS' format as the column default) so SQLite doesn't
+    evaluate datetime('now') for every row.
+    """
+    stamp = (imported_at,)
+    rows = [m + stamp for m in messages]
+
+    before = conn.total_changes
     cur = conn.cursor()
-    inserted = 0
-
-    for m in messages:
-        cur.execute(
-            """
-            INSERT OR IGNORE INTO pkt_messages
-              (pkt_file, msg_index, date_iso, date_raw, echo,
-               size_bytes, msg_lines, pct_quoted, from_name, subject)
-            VALUES
-              (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                m["pkt_file"],
-                m["msg_index"],
-                m["date_iso"],
-                m["date_raw"],
-                m["echo"],
-                m["size_bytes"],
-                m.get("msg_lines"),
-                m.get("pct_quoted"),
-                m["from_name"],
-                m["subject"],
-            )
-        )
-        inserted += cur.rowcount
 
-    conn.commit()
-    return inserted
+    # Full chunks go through the multi-row INSERT, the tail via executemany
+    full = len(rows) - len(rows) % INSERT_CHUNK
+    for i in range(0, full, INSERT_CHUNK):
+        cur.execute(INSERT_SQL_CHUNK, list(chain.from_iterable(rows[i:i + INSERT_CHUNK])))
+    if full < len(rows):
+        cur.executemany(INSERT_SQL, rows[full:])
+    # Ignored duplicates don't count as changes
+    return conn.total_changes - before
+
+
+def delete_pkts(pending: List[Tuple[Path, int, int]]) -> None:
+    """
+    Delete fully imported .pkt files. Only call this after the transaction
+    holding their rows has been committed.
+    """
+    for pkt, n_msgs, inserted in pending:
+        try:
+            pkt.unlink()
+            print(f"[OK] {pkt.name}: {n_msgs} msgs (inserted {inserted}), deleted")
+        except Exception as e:
+            print(f"[WARN] {pkt.name}: imported but could not delete: {e}")
+    pending.clear()
 
 
 # ============================================================
 # Main
 # ============================================================
 
+def iter_pkts(root: Path, recursive: bool):
+    """
+    Yield *.pkt files (any case) under root using os.scandir, which gets
+    file type info from the directory read instead of a stat per Path.
+    Symlinked directories are not followed (same as Path.rglob).
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except PermissionError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(e.path)
+                elif len(e.name) > 4 and e.name[-4:].lower() == ".pkt" and e.is_file():
+                    yield Path(e.path)
+
+
 def main():
     ap = argparse.ArgumentParser(
         description="Index FidoNet *.pkt files into a SQLite database "
@@ -342,6 +556,18 @@ def main():
         "--recursive", action="store_true",
         help="Scan folder recursively for *.pkt"
     )
+    ap.add_argument(
+        "--commit-every", type=int, default=0, metavar="N",
+        help="Commit after every N files (default: 0 = one transaction for the whole run)"
+    )
+    ap.add_argument(
+        "--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N",
+        help="Parse packets in N worker processes (default: CPU count; 1 = no pool)"
+    )
+    ap.add_argument(
+        "--no-body-stats", action="store_true",
+        help="Skip msg_lines/pct_quoted (stored as NULL); only look for the AREA line"
+    )
     args = ap.parse_args()
 
     folder = Path(args.folder).expanduser().resolve()
@@ -351,15 +577,7 @@ def main():
         raise SystemExit(f"Not a directory: {folder}")
 
     # Case-insensitive PKT discovery (.pkt, .PKT, etc.)
-    if args.recursive:
-        candidates = folder.rglob("*")
-    else:
-        candidates = folder.iterdir()
-
-    pkt_files = sorted(
-        p for p in candidates
-        if p.is_file() and p.suffix.lower() == ".pkt"
-    )
+    pkt_files = sorted(iter_pkts(folder, args.recursive))
 
     if not pkt_files:
         print(f"No .pkt files found in {folder} (case-insensitive .pkt scan)")
@@ -373,44 +591,76 @@ def main():
     total_msgs = 0
     total_inserted = 0
     processed_files = 0
-
-    for pkt in pkt_files:
-        try:
-            messages = parse_pkt_file(pkt)
-        except Exception as e:
-            print(f"[ERROR] {pkt}: {e}")
-            continue
-
-        if args.test:
-            print(f"=== {pkt.name}: {len(messages)} messages ===")
-            for m in messages:
-                print(
-                    f"{m['pkt_file']} #{m['msg_index']}: "
-                    f"date_iso={m['date_iso']!r} date_raw={m['date_raw']!r} "
-                    f"echo={m['echo']!r} size={m['size_bytes']} "
-                    f"lines={m['msg_lines']} quoted={m['pct_quoted']} "
-                    f"from={m['from_name']!r} subj={m['subject']!r}"
-                )
-            total_msgs += len(messages)
-            processed_files += 1
-            continue
-
-        inserted = insert_messages(conn, messages)
-        total_msgs += len(messages)
-        total_inserted += inserted
-        processed_files += 1
-
-        if args.delete and inserted == len(messages):
-            try:
-                pkt.unlink()
-                print(f"[OK] {pkt.name}: {len(messages)} msgs (inserted {inserted}), deleted")
-            except Exception as e:
-                print(f"[WARN] {pkt.name}: imported but could not delete: {e}")
-        else:
-            print(f"[OK] {pkt.name}: {len(messages)} msgs (inserted {inserted})")
-
-    if not args.test and conn:
-        conn.close()
+    files_since_commit = 0
+    pending_deletes: List[Tuple[Path, int, int]] = []
+    imported_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    # One explicit transaction for the whole run (or per --commit-every N
+    # files) instead of a commit per file. Deletes wait for the commit.
+    if conn:
+        conn.execute("BEGIN IMMEDIATE")
+
+    # Parsing is CPU-bound and independent per file, so fan it out to worker
+    # processes. All SQLite work stays here in the parent, in file order.
+    jobs = max(args.jobs, 1)
+    use_pool = jobs > 1 and len(pkt_files) > 1
+    job = functools.partial(parse_pkt_job, want_stats=not args.no_body_stats)
+
+    try:
+        with (ProcessPoolExecutor(max_workers=jobs) if use_pool else nullcontext()) as ex:
+            if use_pool:
+                parsed = ex.map(job, pkt_files)
+            else:
+                parsed = map(job, pkt_files)
+
+            for pkt, (messages, err) in zip(pkt_files, parsed):
+                if err is not None:
+                    print(f"[ERROR] {pkt}: {err}")
+                    continue
+
+                if args.test:
+                    print(f"=== {pkt.name}: {len(messages)} messages ===")
+                    for (pkt_file, msg_index, date_iso, date_raw, echo, size_bytes,
+                         msg_lines, pct_quoted, from_name, subject) in messages:
+                        print(
+                            f"{pkt_file} #{msg_index}: "
+                            f"date_iso={date_iso!r} date_raw={date_raw!r} "
+                            f"echo={echo!r} size={size_bytes} "
+                            f"lines={msg_lines} quoted={pct_quoted} "
+                            f"from={from_name!r} subj={subject!r}"
+                        )
+                    total_msgs += len(messages)
+                    processed_files += 1
+                    continue
+
+                inserted = insert_messages_batch(conn, messages, imported_at)
+                total_msgs += len(messages)
+                total_inserted += inserted
+                processed_files += 1
+
+                if args.delete and inserted == len(messages):
+                    pending_deletes.append((pkt, len(messages), inserted))
+                else:
+                    print(f"[OK] {pkt.name}: {len(messages)} msgs (inserted {inserted})")
+
+                files_since_commit += 1
+                if args.commit_every > 0 and files_since_commit >= args.commit_every:
+                    conn.commit()
+                    delete_pkts(pending_deletes)
+                    files_since_commit = 0
+                    conn.execute("BEGIN IMMEDIATE")
+
+        if conn:
+            conn.commit()
+            delete_pkts(pending_deletes)
+            conn.executescript(SCHEMA_SQL_SECONDARY_INDEXES)
+    except BaseException:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            conn.close()
 
     if args.test:
         print(
@@ -24,37 +24,51 @@
 
 
 import argparse
+import functools
+import heapq
+import io
 import sqlite3
+import sys
 import json
 import re
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import date, datetime, timedelta
+from collections import Counter, defaultdict
 from textwrap import shorten
 
 # ----------------------------------------------------------------------
 # Date parsing
 # ----------------------------------------------------------------------
 
+# Formats tried by parse_date_any(), kept ordered by how often each one
+# has matched (_DATE_FMT_WINS), so a DB that mostly uses one format (the
+# usual case) matches on the first strptime attempt and the odd stray
+# date doesn't reshuffle the order.
+_DATE_FMTS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+    "%d %b %y %H:%M:%S",
+    "%d-%b-%Y %H:%M",
+    "%d-%b-%y",
+]
+_DATE_FMT_WINS = Counter()
+
+@functools.lru_cache(maxsize=65536)
 def parse_date_any(s: str) -> datetime:
     s = (s or "").strip()
     if not s:
         raise ValueError("empty date")
 
-    fmts = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d",
-        "%d %b %y %H:%M:%S",
-        "%d-%b-%Y %H:%M",
-        "%d-%b-%y",
-    ]
-    last_err = None
-    for fmt in fmts:
+    for i, fmt in enumerate(_DATE_FMTS):
         try:
-            return datetime.strptime(s, fmt)
-        except ValueError as e:
-            last_err = e
-            pass
+            dt = datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        wins = _DATE_FMT_WINS
+        wins[fmt] += 1
+        if i and wins[fmt] > wins[_DATE_FMTS[0]]:
+            _DATE_FMTS.sort(key=wins.__getitem__, reverse=True)
+        return dt
     raise ValueError(f"Unrecognized date format: {s!r}")
 
 def nice_header_date(s: str) -> str:
@@ -64,6 +78,25 @@ def nice_header_date(s: str) -> str:
 # DB helpers
 # ----------------------------------------------------------------------
 
+# Read-heavy connection tuning: big page cache and mmap so repeated range
+# queries are served from memory.
+REPORT_PRAGMA_SQL = """
+PRAGMA mmap_size=1073741824;
+PRAGMA cache_size=-200000;
+PRAGMA temp_store=MEMORY;
+"""
+
+# Rows per fetchmany() call (cursor.arraysize) on the big report queries
+FETCH_BATCH = 10000
+
+def iter_batches(cur):
+    """Yield rows from cur via fetchmany(cur.arraysize) instead of fetchall()."""
+    while True:
+        batch = cur.fetchmany()
+        if not batch:
+            return
+        yield from batch
+
 def table_columns(conn, table: str):
     cur = conn.cursor()
     cur.execute(f"PRAGMA table_info({table})")
@@ -87,10 +120,55 @@ def pick_date_expression(cols):
 
     return "COALESCE(" + ", ".join(parts) + ")"
 
+def ensure_report_indexes(conn, date_expr: str) -> None:
+    """Create indexes matching the report queries (safe to re-run).
+
+    Range filters use the COALESCE date expression rather than a plain
+    column, so the indexes are built on that exact expression: one on its
+    own (area summary, MIN/MAX) and one behind echo (--top).
+    ANALYZE runs once so the planner has stats; PRAGMA optimize keeps
+    them fresh on later runs.
+    """
+    cur = conn.cursor()
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_pkt_dateexpr ON pkt_messages({date_expr})")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_pkt_echo_date ON pkt_messages(echo, {date_expr})")
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'")
+    if not cur.fetchone():
+        cur.execute("ANALYZE")
+    cur.execute("PRAGMA optimize")
+    conn.commit()
+
+def create_message_view(conn, date_expr: str) -> None:
+    """Create the TEMP view v_msg the report queries read from.
+
+    It exposes the COALESCE date expression once as any_date (plus the
+    table rowid as msg_rowid, since views have none), so queries filter on
+    any_date instead of splicing date_expr in everywhere. SQLite flattens
+    the view, so idx_pkt_dateexpr / idx_pkt_echo_date are still used.
+    Must run before PRAGMA query_only: TEMP objects count as writes.
+    """
+    conn.execute(
+        f"CREATE TEMP VIEW IF NOT EXISTS v_msg AS "
+        f"SELECT rowid AS msg_rowid, {date_expr} AS any_date, * FROM pkt_messages"
+    )
+
 # ----------------------------------------------------------------------
 # Buckets
 # ----------------------------------------------------------------------
 
+# GLOB shapes of ISO dates whose day can be taken as the first 10 chars
+# without changing what parse_date_any() would accept (the time part, if
+# any, has to be in range too).
+_GLOB_YMD = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+ISO_DAY_GLOBS = (
+    _GLOB_YMD,
+    _GLOB_YMD + "[ T][01][0-9]:[0-5][0-9]:[0-5][0-9]",
+    _GLOB_YMD + "[ T]2[0-3]:[0-5][0-9]:[0-5][0-9]",
+)
+
+# Python-side twin of _GLOB_YMD, for day keys the GROUP BY query trimmed
+_ISO_DAY_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
 def month_bucket(dt: datetime) -> int:
     # Jan/Feb/Mar shown as 13/14/15 to match your seasonal sample layout
     return dt.month + 12 if dt.month in (1, 2, 3) else dt.month
@@ -98,16 +176,11 @@ def month_bucket(dt: datetime) -> int:
 def build_day_columns(dt_min: datetime, dt_max: datetime):
     """Build a list of daily column keys across the inclusive range.
 
-    We use *date objects* as the internal keys so counting is unambiguous,
-    but we can still print a tidy header (DD only) even across month changes.
+    Keys are day ordinals (date.toordinal()) so counting is unambiguous and
+    cheap to hash; date.fromordinal() turns one back into a tidy DD header
+    even across month changes.
     """
-    cols = []
-    d = dt_min.date()
-    end = dt_max.date()
-    while d <= end:
-        cols.append(d)
-        d += timedelta(days=1)
-    return cols
+    return list(range(dt_min.date().toordinal(), dt_max.date().toordinal() + 1))
 
 # ----------------------------------------------------------------------
 # Top-per-echo helpers
@@ -120,6 +193,10 @@ def _pick_first_column(cols, candidates):
             return c
     return None
 
+# Repeated "RE:" / "Re:" / "re[2]:" style prefixes (compiled once)
+_RE_PREFIX = re.compile(r'^(?:re(?:\[\d+\])?:\s*)+', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=65536)
 def _normalize_subject(subj: str) -> str:
     """Normalise subject so that replies with RE: count towards the same thread.
 
@@ -129,18 +206,34 @@ def _normalize_subject(subj: str) -> str:
         return "(no subject)"
     s = subj.strip()
     # Strip repeated RE-style prefixes
-    s = re.sub(r'^(re(\[\d+\])?:\s*)+', '', s, flags=re.IGNORECASE)
+    s = _RE_PREFIX.sub('', s)
     s = s.strip()
     return s or "(no subject)"
 
-def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name: str,
+# (suffix, divisor) per power-of-1024 scale, indexed by bit_length // 10
+_BYTE_SCALES = (("B", 1), ("K", 1 << 10), ("M", 1 << 20), ("G", 1 << 30))
+
+def _fmt_bytes(n) -> str:
+    """Human-readable size: 512B, 1.5K, 2.0M, 3.1G (G is the largest unit)."""
+    n = int(n or 0)
+    idx = min((max(n, 0).bit_length() - 1) // 10, 3)
+    if idx <= 0:
+        return f"{n}B"
+    suffix, div = _BYTE_SCALES[idx]
+    return f"{n / div:.1f}{suffix}"
+
+def run_top_report(conn, cols, date_from: str, date_to: str, echo_name: str,
                    schema_version: str, limit: int = 10) -> None:
     """Print top posters/subjects for a single echo.
 
+    `cols` is the pkt_messages column list main() already read, so the
+    table_info PRAGMA isn't issued a second time.
     If the database includes a message size column, also prints size-based TOP tables.
     """
+    # Plain tuple rows (no sqlite3.Row name lookups) for the per-row loop
     cur = conn.cursor()
-    cols = table_columns(conn, "pkt_messages")
+    cur.row_factory = None
+    cur.arraysize = FETCH_BATCH
 
     poster_col = _pick_first_column(
         cols,
@@ -169,82 +262,103 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
             missing.append("subject column (subject/subj/title)")
         raise SystemExit("pkt_messages table is missing required columns: " + ", ".join(missing))
 
+    # Fixed column positions (NULL when a column is missing) so rows can be
+    # unpacked positionally.
     select_bits = [
         f"{poster_col} AS poster",
         f"{subj_col} AS subject",
+        f"{size_col or 'NULL'} AS msg_size",
+        f"{lines_col or 'NULL'} AS msg_lines",
     ]
-    if size_col:
-        select_bits.append(f"{size_col} AS msg_size")
-    if lines_col:
-        select_bits.append(f"{lines_col} AS msg_lines")
 
     cur.execute(
         f"""
         SELECT {', '.join(select_bits)}
-        FROM pkt_messages
+        FROM v_msg
         WHERE echo = ?
-          AND {date_expr} >= ? AND {date_expr} <= ?
+          AND any_date >= ? AND any_date <= ?
+        ORDER BY msg_rowid
         """,
         (echo_name, date_from, date_to),
     )
-    rows = cur.fetchall()
-
-    if not rows:
-        print(f"No messages found in echo {echo_name!r} for selected date range.")
-        return
-
-    from collections import Counter
 
     poster_counts = Counter()
-    subject_counts = Counter()
+    total_msgs = 0
 
-    # Optional size aggregations per poster
-    poster_total_bytes = Counter()
-    poster_max_bytes = Counter()
-    poster_total_lines = Counter()
-    poster_max_lines = Counter()
+    # Optional size/line aggregations per poster, fused into one small list
+    # per poster so each row costs a single dict lookup:
+    #   [total_bytes, max_bytes, total_lines, max_lines]
+    poster_stats = defaultdict(lambda: [0, 0, 0, 0])
 
     # Optional list of largest single messages
-    biggest_msgs = []  # (size_bytes, lines, poster, subject_root)
-
-    for r in rows:
-        poster = (r["poster"] or "").strip() or "(unknown)"
-        poster_counts[poster] += 1
-
-        root = _normalize_subject(r["subject"])
-        subject_counts[root] += 1
-
-        if size_col:
-            try:
-                sz = int(r["msg_size"] or 0)
-            except Exception:
-                sz = 0
-            poster_total_bytes[poster] += max(sz, 0)
-            poster_max_bytes[poster] = max(poster_max_bytes.get(poster, 0), max(sz, 0))
-
-            if sz > 0:
-                ln = 0
-                if lines_col:
-                    try:
-                        ln = int(r["msg_lines"] or 0)
-                    except Exception:
-                        ln = 0
-                biggest_msgs.append((sz, ln, poster, root))
-
-        if lines_col:
-            try:
-                ln2 = int(r["msg_lines"] or 0)
-            except Exception:
-                ln2 = 0
-            poster_total_lines[poster] += max(ln2, 0)
-            poster_max_lines[poster] = max(poster_max_lines.get(poster, 0), max(ln2, 0))
-
-    def print_top_table(counter, label_header: str, title: str):
+    biggest_msgs = []  # (size_bytes, lines, poster, raw_subject)
+
+    # Stream the rows in fetchmany() batches so memory stays bounded
+    while True:
+        batch = cur.fetchmany()
+        if not batch:
+            break
+        total_msgs += len(batch)
+
+        # Normalise posters once per row, then let Counter() tally the
+        # batch in one call (C-level counting, no per-row += in Python).
+        posters = [(r[0] or "").strip() or "(unknown)" for r in batch]
+        poster_counts.update(posters)
+
+        if not (size_col or lines_col):
+            continue
+
+        for (_, subject, msg_size, msg_lines), poster in zip(batch, posters):
+            stats = poster_stats[poster]
+
+            ln = 0
+            if lines_col:
+                try:
+                    ln = int(msg_lines or 0)
+                except Exception:
+                    ln = 0
+                if ln > 0:
+                    stats[2] += ln
+                    if ln > stats[3]:
+                        stats[3] = ln
+
+            if size_col:
+                try:
+                    sz = int(msg_size or 0)
+                except Exception:
+                    sz = 0
+                if sz > 0:
+                    stats[0] += sz
+                    if sz > stats[1]:
+                        stats[1] = sz
+                    biggest_msgs.append((sz, ln, poster, subject))
+
+    if not total_msgs:
+        print(f"No messages found in echo {echo_name!r} for selected date range.")
+        return
+
+    # Subject threads are grouped inside SQLite via the norm_subj() SQL
+    # function. Ties keep first-seen order, same as Counter.most_common().
+    conn.create_function("norm_subj", 1, _normalize_subject, deterministic=True)
+    cur.execute(
+        f"""
+        SELECT norm_subj({subj_col}) AS root, COUNT(*) AS n
+        FROM v_msg
+        WHERE echo = ?
+          AND any_date >= ? AND any_date <= ?
+        GROUP BY root
+        ORDER BY n DESC, MIN(msg_rowid)
+        LIMIT ?
+        """,
+        (echo_name, date_from, date_to, limit),
+    )
+    top_subjects = cur.fetchall()
+
+    def print_top_table(items, label_header: str, title: str):
         print()
         print(title)
         print("=" * len(title))
 
-        items = counter.most_common(limit)
         if not items:
             print("(no data)")
             return
@@ -269,31 +383,26 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
     print(f"TCOB1 EchoMail top stats for area {echo_name}")
     print(f"(DB schema v{schema_version})")
     print(f"Statistics from {nice_header_date(date_from)} to {nice_header_date(date_to)}")
-    print(f"Total messages in range: {len(rows)}")
+    print(f"Total messages in range: {total_msgs}")
 
-    print_top_table(poster_counts, "Poster", "Top posters")
-    print_top_table(subject_counts, "Subject", "Top subjects")
+    # nlargest() is O(U log limit) instead of a full sort of every poster,
+    # and keeps first-seen order on ties, same as Counter.most_common().
+    top_posters = heapq.nlargest(limit, poster_counts.items(), key=lambda kv: kv[1])
+    print_top_table(top_posters, "Poster", "Top posters")
+    print_top_table(top_subjects, "Subject", "Top subjects")
 
     # Size-based tables (if available)
-    def _fmt_bytes(n: int) -> str:
-        if n is None:
-            return "0B"
-        n = int(n)
-        if n < 1024:
-            return f"{n}B"
-        if n < 1024 * 1024:
-            return f"{n/1024:.1f}K"
-        if n < 1024 * 1024 * 1024:
-            return f"{n/(1024*1024):.1f}M"
-        return f"{n/(1024*1024*1024):.1f}G"
-
     if size_col:
         print()
         title = "Top posters by total message size"
         print(title)
         print("=" * len(title))
 
-        items = poster_total_bytes.most_common(limit)
+        items = heapq.nlargest(
+            limit,
+            ((p, st[0]) for p, st in poster_stats.items()),
+            key=lambda kv: kv[1],
+        )
         if not items:
             print("(no data)")
         else:
@@ -305,7 +414,7 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
             total_width = max(len("Total"), len(_fmt_bytes(max_total)))
 
             # Max size column is useful context
-            max_of_max = max(poster_max_bytes.get(p, 0) for p, _ in items)
+            max_of_max = max(poster_stats[p][1] for p, _ in items)
             max_width = max(len("Max"), len(_fmt_bytes(max_of_max)))
 
             header = f"{'#':>{rank_width}}  {'Poster':<{label_width}}  {'Total':>{total_width}}  {'Max':>{max_width}}"
@@ -313,14 +422,13 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
             print("-" * len(header))
 
             for idx, (poster, total_b) in enumerate(items, start=1):
-                max_b = poster_max_bytes.get(poster, 0)
+                max_b = poster_stats[poster][1]
                 poster_disp = shorten(str(poster), width=label_width, placeholder="…")
                 print(f"{idx:>{rank_width}}  {poster_disp:<{label_width}}  {_fmt_bytes(total_b):>{total_width}}  {_fmt_bytes(max_b):>{max_width}}")
 
         # Biggest individual messages
         if biggest_msgs:
-            biggest_msgs.sort(key=lambda x: x[0], reverse=True)
-            top_big = biggest_msgs[:limit]
+            top_big = heapq.nlargest(limit, biggest_msgs, key=lambda x: x[0])
             print()
             title2 = "Largest individual messages"
             print(title2)
@@ -329,7 +437,7 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
             print("-" * 60)
             for i, (sz, ln, poster, subj) in enumerate(top_big, start=1):
                 poster_disp = shorten(poster, width=20, placeholder="…")
-                subj_disp = shorten(subj, width=60, placeholder="…")
+                subj_disp = shorten(_normalize_subject(subj), width=60, placeholder="…")
                 print(f"{i:>2}  {_fmt_bytes(sz):>8}  {poster_disp:<20}  {subj_disp}")
     else:
         print()
@@ -339,46 +447,57 @@ def run_top_report(conn, date_expr: str, date_from: str, date_to: str, echo_name
 # Known / only / exclude areas file loader
 # ----------------------------------------------------------------------
 
+def _areas_from_json(obj):
+    """Pull the area names out of a parsed area-list JSON document."""
+    if isinstance(obj, list):
+        areas = obj
+    elif isinstance(obj, dict) and isinstance(obj.get("areas"), list):
+        areas = obj["areas"]
+    else:
+        raise SystemExit("Area JSON must be a list or an object with an 'areas' list")
+    out = []
+    for a in areas:
+        if not isinstance(a, str):
+            continue
+        a = a.strip()
+        if a:
+            out.append(a)
+    return out
+
 def load_area_list(path: str):
     """Load a list of echo areas from a file.
 
     Supported formats:
       * .txt/.lst: one area per line (blank and # lines ignored)
       * .json: either a JSON list ["AREA1", "AREA2"] or {"areas": [...]}.
+
+    The file is streamed rather than read into memory first; text lists
+    are consumed line by line and JSON goes straight to json.load().
     """
     if not path:
         return []
 
     with open(path, "r", encoding="utf-8") as f:
-        data = f.read()
-
-    # JSON if it looks like JSON or endswith .json
-    if path.lower().endswith(".json") or data.lstrip().startswith(("[", "{")):
-        obj = json.loads(data)
-        if isinstance(obj, list):
-            areas = obj
-        elif isinstance(obj, dict) and isinstance(obj.get("areas"), list):
-            areas = obj["areas"]
-        else:
-            raise SystemExit("Area JSON must be a list or an object with an 'areas' list")
+        if path.lower().endswith(".json"):
+            return _areas_from_json(json.load(f))
+
         out = []
-        for a in areas:
-            if not isinstance(a, str):
+        first = True
+        for line in f:
+            line = line.strip()
+            if not line:
                 continue
-            a = a.strip()
-            if a:
-                out.append(a)
+            # JSON if the first non-blank content looks like JSON
+            if first:
+                first = False
+                if line.startswith(("[", "{")):
+                    f.seek(0)
+                    return _areas_from_json(json.load(f))
+            if line.startswith("#"):
+                continue
+            out.append(line)
         return out
 
-    # Plain text list
-    out = []
-    for line in data.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        out.append(line)
-    return out
-
 # ----------------------------------------------------------------------
 # Main
 # ----------------------------------------------------------------------
@@ -423,6 +542,7 @@ def main():
 
     conn = sqlite3.connect(args.db)
     conn.row_factory = sqlite3.Row
+    conn.executescript(REPORT_PRAGMA_SQL)
     cur = conn.cursor()
 
     # Ensure meta table exists + schema_version present (safe even for old DBs)
@@ -447,20 +567,32 @@ def main():
     if not cur.fetchone():
         raise SystemExit("No table pkt_messages found in this DB. Are you pointing at the right file?")
 
-    cur.execute("SELECT COUNT(*) AS c FROM pkt_messages")
-    total_rows = cur.fetchone()["c"]
-    if total_rows == 0:
+    cols_in_table = table_columns(conn, "pkt_messages")
+    date_expr = pick_date_expression(cols_in_table)
+    ensure_report_indexes(conn, date_expr)
+    create_message_view(conn, date_expr)
+
+    # Setup writes (meta row, report indexes, v_msg) are done; everything from
+    # here on is read-only.
+    cur.execute("PRAGMA query_only=1")
+
+    # Row presence and DB date range in one statement: EXISTS stops at the
+    # first row and MIN/MAX are single idx_pkt_dateexpr probes, so there is
+    # no COUNT(*) scan of the whole table.
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pkt_messages) AS has_rows, "
+        "(SELECT MIN(any_date) FROM v_msg) AS mn, "
+        "(SELECT MAX(any_date) FROM v_msg) AS mx"
+    )
+    r = cur.fetchone()
+    has_rows = bool(r["has_rows"])
+    if not has_rows:
         # Allow zero-traffic reports if the user supplies a date range and a known-areas file
         if not (args.known_areas and args.date_from and args.date_to):
             raise SystemExit("pkt_messages is empty (0 rows).")
 
-    cols_in_table = table_columns(conn, "pkt_messages")
-    date_expr = pick_date_expression(cols_in_table)
-
     # DB date range (or user-supplied range if there are no message rows yet)
-    if total_rows > 0:
-        cur.execute(f"SELECT MIN({date_expr}) AS mn, MAX({date_expr}) AS mx FROM pkt_messages")
-        r = cur.fetchone()
+    if has_rows:
         db_min_s, db_max_s = r["mn"], r["mx"]
         if not db_min_s or not db_max_s:
             raise SystemExit("Rows exist, but all date fields are empty (date_iso/imported_at/date_raw).")
@@ -523,7 +655,7 @@ def main():
 
     # If user requested a per-echo top report, do that and exit early
     if args.top:
-        run_top_report(conn, date_expr, date_from, date_to, args.top, schema_version)
+        run_top_report(conn, cols_in_table, date_from, date_to, args.top, schema_version)
         conn.close()
         return
 
@@ -542,39 +674,59 @@ def main():
         day_cols = build_day_columns(dt_from, dt_to)
         columns = day_cols
         # Tidy day-only header even when month changes
-        col_header = " ".join(f"{d.strftime('%d'):>4s}" for d in columns)
-
-    # Query rows in range
-    cur.execute(
+        col_header = " ".join(f"{date.fromordinal(o).strftime('%d'):>4s}" for o in columns)
+
+    # Tuple rows for the per-group loop below
+    group_cur = conn.cursor()
+    group_cur.row_factory = None
+    group_cur.arraysize = FETCH_BATCH
+
+    # Count messages per (echo, day) inside SQLite rather than pulling every
+    # row into Python. Well-formed ISO dates are reduced to their YYYY-MM-DD
+    # prefix; anything else is grouped on the full string and parsed below.
+    iso_day_match = " OR ".join(f"any_date GLOB '{g}'" for g in ISO_DAY_GLOBS)
+    group_cur.execute(
         f"""
-        SELECT echo, {date_expr} AS any_date
-        FROM pkt_messages
-        WHERE {date_expr} >= ? AND {date_expr} <= ?
+        SELECT echo,
+               CASE WHEN {iso_day_match}
+                    THEN substr(any_date, 1, 10)
+                    ELSE any_date
+               END AS day_key,
+               COUNT(*) AS n
+        FROM v_msg
+        WHERE any_date >= ? AND any_date <= ?
+        GROUP BY echo, day_key
         """,
         (date_from, date_to),
     )
 
-    counts = defaultdict(lambda: defaultdict(int))
+    # Dense per-area rows of column counts: area -> [n per column], with
+    # col_index mapping a month bucket / day to its position in `columns`.
+    col_index = {c: i for i, c in enumerate(columns)}
+    n_cols = len(columns)
+    counts = {}
     areas_seen = set()
     bad_dates = 0
 
-    for row in cur.fetchall():
-        area = (row["echo"] or "").strip() or "UNKNOWN"
+    for echo, day_key, n in iter_batches(group_cur):
+        area = (echo or "").strip() or "UNKNOWN"
         try:
-            dt = parse_date_any(row["any_date"])
+            if len(day_key) == 10 and _ISO_DAY_RE.match(day_key):
+                # Already YYYY-MM-DD: read the fields by offset, no strptime
+                d = date(int(day_key[:4]), int(day_key[5:7]), int(day_key[8:]))
+            else:
+                d = parse_date_any(day_key).date()
         except Exception:
-            bad_dates += 1
+            bad_dates += n
             continue
 
-        if period == "month":
-            b = month_bucket(dt)
-            if b in columns:
-                counts[area][b] += 1
-        else:
-            # Day keys are date objects (see build_day_columns)
-            key = dt.date()
-            if key in columns:
-                counts[area][key] += 1
+        # Day columns are date ordinals (see build_day_columns)
+        i = col_index.get(month_bucket(d) if period == "month" else d.toordinal())
+        if i is not None:
+            row = counts.get(area)
+            if row is None:
+                row = counts[area] = [0] * n_cols
+            row[i] += n
 
         areas_seen.add(area)
 
@@ -599,16 +751,18 @@ def main():
     else:
         exclude_set = set()
 
-    # Print report
-    print("TCOB1 EchoMail area reporter")
-    print(f"(DB schema v{schema_version})")
-    print()
-    print(f"Statistics from {nice_header_date(date_from)} to {nice_header_date(date_to)}")
-    print()
+    # Print report. The whole table is built in a StringIO and written to
+    # stdout once, with the per-row format string worked out up front.
+    out = io.StringIO()
+    print("TCOB1 EchoMail area reporter", file=out)
+    print(f"(DB schema v{schema_version})", file=out)
+    print(file=out)
+    print(f"Statistics from {nice_header_date(date_from)} to {nice_header_date(date_to)}", file=out)
+    print(file=out)
 
     area_width = args.area_width
-    print(f"{'Area':<{area_width}}{col_header}   Total")
-    print("=" * (area_width + len(col_header) + 8))
+    print(f"{'Area':<{area_width}}{col_header}   Total", file=out)
+    print("=" * (area_width + len(col_header) + 8), file=out)
 
     # Per-day totals across all included areas (for a totals row at the bottom)
     day_totals = [0] * len(columns)
@@ -624,28 +778,30 @@ def main():
     if exclude_set:
         iter_areas = [a for a in iter_areas if a not in exclude_set]
 
+    # "<area><v> <v> ... : <total>" with every width fixed at this point
+    row_fmt = f"{{:<{area_width}}}" + " ".join(["{:>4d}"] * n_cols) + " : {:>5d}\n"
+    write = out.write
+    zero_row = [0] * n_cols
     for area in iter_areas:
-        row_vals = [counts[area].get(c, 0) for c in columns]
+        row_vals = counts.get(area, zero_row)
+        total = sum(row_vals)
         # Accumulate day totals
-        for i, v in enumerate(row_vals):
-            day_totals[i] += v
-            grand_total += v
+        day_totals = [a + b for a, b in zip(day_totals, row_vals)]
+        grand_total += total
 
-        total = sum(row_vals)
-        vals_str = " ".join(f"{v:>4d}" for v in row_vals)
-        print(f"{shorten(area, width=area_width-1, placeholder='…'):<{area_width}}{vals_str} : {total:>5d}")
+        write(row_fmt.format(shorten(area, width=area_width-1, placeholder='…'), *row_vals, total))
 
     # Totals row
     total_width = area_width + len(col_header) + 8
     sep = ('==' * (total_width // 2)) + ('=' if (total_width % 2) else '')
-    print(sep)
-    totals_str = " ".join(f"{v:>4d}" for v in day_totals)
-    print(f"{'TOTALS':<{area_width}}{totals_str} : {grand_total:>5d}")
+    print(sep, file=out)
+    write(row_fmt.format('TOTALS', *day_totals, grand_total))
 
     if bad_dates:
-        print()
-        print(f"(NOTE: skipped {bad_dates} rows with unparseable dates)")
+        print(file=out)
+        print(f"(NOTE: skipped {bad_dates} rows with unparseable dates)", file=out)
 
+    sys.stdout.write(out.getvalue())
     conn.close()
 
 if __name__ == "__main__":